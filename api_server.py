@@ -144,12 +144,14 @@ async def analyze_document(
             # Use local regex processing
             logger.info(f"Processing locally: {len(text)} characters")
             
-            # Extract clauses with regex
+            # Split once and reuse the clauses for both result formats
             clause_types = config.CLAUSE_TYPES
-            extracted_clauses = clause_extractor.extract_clauses_by_type(text, clause_types)
-            
-            # Get detailed clauses
             detailed_clauses = clause_extractor.split_into_clauses(text)
+            
+            # Extract clauses with regex
+            extracted_clauses = clause_extractor.extract_clauses_by_type(text, clause_types, clauses=detailed_clauses)
+            
+            # Group detailed clauses
             grouped_detailed = clause_extractor.group_clauses_by_type(detailed_clauses)
             
             # Convert to API format
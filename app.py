@@ -171,11 +171,11 @@ class LegalDocumentAnalyzerApp:
         
         # Step 3: Extract clauses
         thinking_container.info("**Extracting:** Applying pattern recognition to identify clause types...")
-        extracted_clauses = self.clause_extractor.extract_clauses_by_type(text, clause_types)
+        detailed_clauses = self.clause_extractor.split_into_clauses(text)
+        extracted_clauses = self.clause_extractor.extract_clauses_by_type(text, clause_types, clauses=detailed_clauses)
         
         # Step 4: Detailed analysis
         thinking_container.info("**Processing:** Performing detailed clause analysis and categorization...")
-        detailed_clauses = self.clause_extractor.split_into_clauses(text)
         grouped_detailed = self.clause_extractor.group_clauses_by_type(detailed_clauses)
         
         # Final status
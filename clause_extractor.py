@@ -1,11 +1,131 @@
 import re
 import logging
-from typing import List, Dict, Optional, Tuple
+import functools
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Enhanced patterns for legal document clause identification
+CLAUSE_PATTERNS = [
+    # Section/Article/Clause with numbers (e.g., "Section 1.1", "Article 5", "Clause 3.2.1")
+    r"(?P<title>(?:Section|Article|Clause|Schedule|Paragraph|Part|Chapter)\s+\d+(?:\.\d+)*(?:\.\d+)*[^\n]*)",
+    
+    # Numbered headings (e.g., "1.", "2.1", "3.2.1")
+    r"(?P<title>\d+(?:\.\d+)*(?:\.\d+)*\.?\s+[A-Z][^\n]*)",
+    
+    # Lettered sections (e.g., "(a)", "(i)", "A.")
+    r"(?P<title>\([a-z]+\)|[A-Z]\.)\s+[^\n]*",
+    
+    # Common legal headings without numbers
+    r"(?P<title>(?:WHEREAS|NOW THEREFORE|DEFINITIONS|TERMS AND CONDITIONS|PAYMENT|TERMINATION|LIABILITY|CONFIDENTIALITY|INTELLECTUAL PROPERTY|GOVERNING LAW|DISPUTE RESOLUTION|FORCE MAJEURE|AMENDMENTS|WARRANTIES|REPRESENTATIONS)[^\n]*)"
+]
+
+# Clause type classification patterns
+CLAUSE_TYPE_PATTERNS = {
+    "Terms and Conditions": [
+        r"terms?\s+and\s+conditions?",
+        r"general\s+terms?",
+        r"conditions?\s+of\s+use",
+        r"agreement\s+terms?"
+    ],
+    "Payment Terms": [
+        r"payment\s+terms?",
+        r"payment\s+obligations?",
+        r"fees?\s+and\s+charges?",
+        r"billing",
+        r"invoice",
+        r"compensation"
+    ],
+    "Termination Clause": [
+        r"termination",
+        r"expir(?:ation|y)",
+        r"end\s+of\s+agreement",
+        r"dissolution"
+    ],
+    "Liability Clause": [
+        r"liability",
+        r"damages?",
+        r"limitation\s+of\s+liability",
+        r"indemnif(?:ication|y)",
+        r"harm",
+        r"loss"
+    ],
+    "Confidentiality Clause": [
+        r"confidential(?:ity)?",
+        r"non\-?disclosure",
+        r"proprietary\s+information",
+        r"trade\s+secrets?",
+        r"privacy"
+    ],
+    "Intellectual Property": [
+        r"intellectual\s+property",
+        r"copyright",
+        r"trademark",
+        r"patent",
+        r"proprietary\s+rights?",
+        r"ownership"
+    ],
+    "Governing Law": [
+        r"governing\s+law",
+        r"applicable\s+law",
+        r"jurisdiction",
+        r"venue",
+        r"choice\s+of\s+law"
+    ],
+    "Dispute Resolution": [
+        r"dispute\s+resolution",
+        r"arbitration",
+        r"mediation",
+        r"litigation",
+        r"legal\s+proceedings?"
+    ],
+    "Force Majeure": [
+        r"force\s+majeure",
+        r"act\s+of\s+god",
+        r"unforeseeable\s+circumstances?",
+        r"beyond\s+(?:reasonable\s+)?control"
+    ],
+    "Amendments": [
+        r"amendment",
+        r"modification",
+        r"changes?\s+to\s+agreement",
+        r"variation"
+    ],
+    "Definitions": [
+        r"definitions?",
+        r"interpretation",
+        r"meaning",
+        r"shall\s+mean"
+    ],
+    "Representations and Warranties": [
+        r"representations?\s+and\s+warrant(?:ies|y)",
+        r"representations?",
+        r"warrant(?:ies|y)",
+        r"guarantees?",
+        r"assurances?"
+    ]
+}
+
+# Compiled once at import so every extractor and call reuses them
+_CLAUSE_RES = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in CLAUSE_PATTERNS]
+_SECTION_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)*(?:\.\d+)*)")
+_PAGE_MARKER_RE = re.compile(r"---\s*Page\s+(\d+)\s*---")
+
+# Single alternation with one named group per clause type; patterns are
+# lowercase and run over lowercased text, so the scan stays case-sensitive
+_CLAUSE_TYPE_BY_SLUG = {
+    re.sub(r"\W+", "_", clause_type).lower(): clause_type
+    for clause_type in CLAUSE_TYPE_PATTERNS
+}
+_CLAUSE_TYPE_RE = re.compile(
+    "|".join(
+        f"(?P<{slug}>{'|'.join(CLAUSE_TYPE_PATTERNS[clause_type])})"
+        for slug, clause_type in _CLAUSE_TYPE_BY_SLUG.items()
+    )
+)
+
+@dataclass(slots=True, frozen=True)
 class Clause:
     """Data class representing a legal clause"""
     clause_name: str
@@ -17,107 +137,26 @@ class Clause:
 class ClauseExtractor:
     """Deterministic clause extractor using regex patterns for legal documents"""
     
-    def __init__(self):
-        # Enhanced patterns for legal document clause identification
-        self.clause_patterns = [
-            # Section/Article/Clause with numbers (e.g., "Section 1.1", "Article 5", "Clause 3.2.1")
-            r"(?P<title>(?:Section|Article|Clause|Schedule|Paragraph|Part|Chapter)\s+\d+(?:\.\d+)*(?:\.\d+)*[^\n]*)",
-            
-            # Numbered headings (e.g., "1.", "2.1", "3.2.1")
-            r"(?P<title>\d+(?:\.\d+)*(?:\.\d+)*\.?\s+[A-Z][^\n]*)",
-            
-            # Lettered sections (e.g., "(a)", "(i)", "A.")
-            r"(?P<title>\([a-z]+\)|[A-Z]\.)\s+[^\n]*",
-            
-            # Common legal headings without numbers
-            r"(?P<title>(?:WHEREAS|NOW THEREFORE|DEFINITIONS|TERMS AND CONDITIONS|PAYMENT|TERMINATION|LIABILITY|CONFIDENTIALITY|INTELLECTUAL PROPERTY|GOVERNING LAW|DISPUTE RESOLUTION|FORCE MAJEURE|AMENDMENTS|WARRANTIES|REPRESENTATIONS)[^\n]*)"
-        ]
+    def __init__(self, split_cache_size: int = 0):
+        """
+        Initialize clause extractor
+        
+        Args:
+            split_cache_size: Number of recent documents whose splits are memoized
+                (default: 0, disabled). Each cached entry keeps the full document
+                text and its clauses alive for the lifetime of the extractor, so
+                long-lived server instances should leave this off and pass
+                clauses= to extract_clauses_by_type instead.
+        """
+        self.clause_patterns = CLAUSE_PATTERNS
+        self.clause_type_patterns = CLAUSE_TYPE_PATTERNS
         
-        # Clause type classification patterns
-        self.clause_type_patterns = {
-            "Terms and Conditions": [
-                r"terms?\s+and\s+conditions?",
-                r"general\s+terms?",
-                r"conditions?\s+of\s+use",
-                r"agreement\s+terms?"
-            ],
-            "Payment Terms": [
-                r"payment\s+terms?",
-                r"payment\s+obligations?",
-                r"fees?\s+and\s+charges?",
-                r"billing",
-                r"invoice",
-                r"compensation"
-            ],
-            "Termination Clause": [
-                r"termination",
-                r"expir(?:ation|y)",
-                r"end\s+of\s+agreement",
-                r"dissolution"
-            ],
-            "Liability Clause": [
-                r"liability",
-                r"damages?",
-                r"limitation\s+of\s+liability",
-                r"indemnif(?:ication|y)",
-                r"harm",
-                r"loss"
-            ],
-            "Confidentiality Clause": [
-                r"confidential(?:ity)?",
-                r"non\-?disclosure",
-                r"proprietary\s+information",
-                r"trade\s+secrets?",
-                r"privacy"
-            ],
-            "Intellectual Property": [
-                r"intellectual\s+property",
-                r"copyright",
-                r"trademark",
-                r"patent",
-                r"proprietary\s+rights?",
-                r"ownership"
-            ],
-            "Governing Law": [
-                r"governing\s+law",
-                r"applicable\s+law",
-                r"jurisdiction",
-                r"venue",
-                r"choice\s+of\s+law"
-            ],
-            "Dispute Resolution": [
-                r"dispute\s+resolution",
-                r"arbitration",
-                r"mediation",
-                r"litigation",
-                r"legal\s+proceedings?"
-            ],
-            "Force Majeure": [
-                r"force\s+majeure",
-                r"act\s+of\s+god",
-                r"unforeseeable\s+circumstances?",
-                r"beyond\s+(?:reasonable\s+)?control"
-            ],
-            "Amendments": [
-                r"amendment",
-                r"modification",
-                r"changes?\s+to\s+agreement",
-                r"variation"
-            ],
-            "Definitions": [
-                r"definitions?",
-                r"interpretation",
-                r"meaning",
-                r"shall\s+mean"
-            ],
-            "Representations and Warranties": [
-                r"representations?\s+and\s+warrant(?:ies|y)",
-                r"representations?",
-                r"warrant(?:ies|y)",
-                r"guarantees?",
-                r"assurances?"
-            ]
-        }
+        # Optional per-instance memo of recent documents; split_into_clauses and
+        # extract_clauses_by_type on the same text then share one split
+        if split_cache_size > 0:
+            self._split_cached = functools.lru_cache(maxsize=split_cache_size)(self._split_into_clauses)
+        else:
+            self._split_cached = self._split_into_clauses
     
     def split_into_clauses(self, text: str) -> List[Clause]:
         """
@@ -129,13 +168,18 @@ class ClauseExtractor:
         Returns:
             List of Clause objects
         """
+        # Copy so callers can modify the returned list without touching the cache;
+        # the Clause objects themselves are frozen
+        return list(self._split_cached(text))
+    
+    def _split_into_clauses(self, text: str) -> Tuple[Clause, ...]:
+        """Split text into clauses; memoized by split_into_clauses when enabled"""
         try:
             all_matches = []
             
             # Find all clause headings using different patterns
-            for pattern in self.clause_patterns:
-                matches = list(re.finditer(pattern, text, flags=re.IGNORECASE | re.MULTILINE))
-                all_matches.extend(matches)
+            for clause_re in _CLAUSE_RES:
+                all_matches.extend(clause_re.finditer(text))
             
             # Sort matches by position in text
             all_matches.sort(key=lambda x: x.start())
@@ -171,7 +215,7 @@ class ClauseExtractor:
                 clauses.append(clause)
             
             logger.info(f"Successfully extracted {len(clauses)} clauses from document")
-            return clauses
+            return tuple(clauses)
             
         except Exception as e:
             logger.error(f"Error splitting document into clauses: {str(e)}")
@@ -197,8 +241,7 @@ class ClauseExtractor:
         """Extract section number from clause title"""
         try:
             # Look for patterns like "Section 1.1", "Article 5", "3.2.1"
-            number_pattern = r"(\d+(?:\.\d+)*(?:\.\d+)*)"
-            match = re.search(number_pattern, title)
+            match = _SECTION_NUMBER_RE.search(title)
             return match.group(1) if match else None
             
         except Exception:
@@ -219,12 +262,9 @@ class ClauseExtractor:
             # Combine title and first few lines of content for classification
             text_to_analyze = (title + " " + content[:500]).lower()
             
-            for clause_type, patterns in self.clause_type_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, text_to_analyze, re.IGNORECASE):
-                        return clause_type
-            
-            return None
+            # One scan for all types; the earliest keyword decides the type
+            match = _CLAUSE_TYPE_RE.search(text_to_analyze)
+            return _CLAUSE_TYPE_BY_SLUG[match.lastgroup] if match else None
             
         except Exception:
             return None
@@ -233,8 +273,7 @@ class ClauseExtractor:
         """Extract page reference from clause content"""
         try:
             # Look for page markers that might have been added during PDF extraction
-            page_pattern = r"---\s*Page\s+(\d+)\s*---"
-            match = re.search(page_pattern, content)
+            match = _PAGE_MARKER_RE.search(content)
             return match.group(1) if match else None
             
         except Exception:
@@ -253,29 +292,26 @@ class ClauseExtractor:
         grouped_clauses = {}
         
         for clause in clauses:
-            clause_type = clause.clause_type or "Unclassified"
-            
-            if clause_type not in grouped_clauses:
-                grouped_clauses[clause_type] = []
-            
-            grouped_clauses[clause_type].append(clause)
+            grouped_clauses.setdefault(clause.clause_type or "Unclassified", []).append(clause)
         
         return grouped_clauses
     
-    def extract_clauses_by_type(self, text: str, target_clause_types: List[str] = None) -> Dict[str, List[str]]:
+    def extract_clauses_by_type(self, text: str, target_clause_types: List[str] = None, clauses: Optional[List[Clause]] = None) -> Dict[str, List[str]]:
         """
         Extract and group clauses by type, returning simplified format
         
         Args:
             text: Legal document text
             target_clause_types: List of specific clause types to extract (optional)
+            clauses: Clauses already split from text, to avoid re-splitting (optional)
             
         Returns:
             Dictionary mapping clause types to lists of clause content
         """
         try:
-            # Split document into clauses
-            clauses = self.split_into_clauses(text)
+            # Split document into clauses unless the caller already has them
+            if clauses is None:
+                clauses = self.split_into_clauses(text)
             
             # Group by type
             grouped_clauses = self.group_clauses_by_type(clauses)
@@ -300,3 +336,18 @@ class ClauseExtractor:
         except Exception as e:
             logger.error(f"Error extracting clauses by type: {str(e)}")
             raise
+    
+    def pipe(self, texts: Iterable[str], target_clause_types: List[str] = None) -> Iterator[Dict[str, List[str]]]:
+        """
+        Extract clauses by type from a stream of documents
+        
+        Args:
+            texts: Legal document texts
+            target_clause_types: List of specific clause types to extract (optional)
+            
+        Yields:
+            Dictionary mapping clause types to lists of clause content, one per text
+        """
+        # Documents share the compiled patterns (and the split memo, if enabled)
+        for text in texts:
+            yield self.extract_clauses_by_type(text, target_clause_types)
@@ -24,6 +24,22 @@ class Config:
     # Lambda Configuration
     LAMBDA_FUNCTION_NAME: str = os.getenv("LAMBDA_FUNCTION_NAME", "legal-document-processor")
     
+    # Local LLM (Ollama) Configuration
+    # Match the Ollama server's OLLAMA_NUM_PARALLEL so concurrent chunk
+    # requests are served in parallel rather than queued
+    OLLAMA_NUM_PARALLEL: int = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+    
+    # Local LLM response cache (opt-in with LLM_CACHE_ENABLED=true). Entries are
+    # plaintext JSON containing extracted contract text and are kept on disk
+    # for LLM_CACHE_TTL_DAYS; relative LLM_CACHE_DIR paths resolve against
+    # the project root, not the working directory
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_DIR: str = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.getenv("LLM_CACHE_DIR", os.path.join("data", "llm_cache"))
+    )
+    LLM_CACHE_TTL_DAYS: int = int(os.getenv("LLM_CACHE_TTL_DAYS", "7"))
+    
     # Application Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     MAX_PDF_SIZE_MB: int = int(os.getenv("MAX_PDF_SIZE_MB", "50"))
@@ -1,11 +1,11 @@
 import json
 import boto3
-import PyPDF2
-import io
+import fitz
 import logging
 import re
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 
 # Configure logging
 logger = logging.getLogger()
@@ -14,15 +14,37 @@ logger.setLevel(logging.INFO)
 # Initialize AWS clients
 s3_client = boto3.client('s3')
 
-@dataclass
+# Text yields below these thresholds indicate a scanned/image-only PDF
+MIN_TEXT_CHARS = 200
+MIN_CHARS_PER_PAGE = 50
+
+# Batch responses carry each document's full text, so cap them well under
+# Lambda's 6 MB synchronous response limit; keys that do not fit are
+# returned in "unprocessed_keys" for the caller to send again
+MAX_BATCH_KEYS = 25
+MAX_BATCH_RESPONSE_BYTES = 5 * 1024 * 1024
+
+@dataclass(slots=True)
 class Clause:
-    """Data class representing a legal clause"""
+    """Data class representing a legal clause as offsets into the document text"""
     clause_name: str
-    content: str
+    start: int
+    end: int
     clause_type: Optional[str] = None
     section_number: Optional[str] = None
     page_reference: Optional[str] = None
 
+def clause_to_dict(clause: Clause) -> Dict:
+    """Convert a Clause to a response dictionary without asdict's deep copy"""
+    return {
+        'clause_name': clause.clause_name,
+        'start': clause.start,
+        'end': clause.end,
+        'clause_type': clause.clause_type,
+        'section_number': clause.section_number,
+        'page_reference': clause.page_reference
+    }
+
 def lambda_handler(event, context):
     """
     AWS Lambda function to process legal documents and extract clauses using regex
@@ -33,55 +55,65 @@ def lambda_handler(event, context):
         "key": "path/to/document.pdf",
         "clause_types": ["Terms and Conditions", "Payment Terms", ...]
     }
+    
+    Several documents from the same bucket can be processed in one invocation
+    by sending "keys": ["a.pdf", "b.pdf", ...] instead of "key"; the response
+    body then holds one result per key under "results". At most MAX_BATCH_KEYS
+    documents and MAX_BATCH_RESPONSE_BYTES of results are returned per call;
+    keys left over are listed in "unprocessed_keys".
     """
     try:
         # Extract parameters from event
         bucket = event['bucket']
-        key = event['key']
         clause_types = event.get('clause_types', [])
         
-        logger.info(f"Processing document: s3://{bucket}/{key}")
-        
-        # Download PDF from S3 and extract text
-        pdf_text = extract_text_from_s3_pdf(bucket, key)
-        
-        # Initialize clause extractor
-        extractor = ClauseExtractor()
-        
-        # Extract clauses using deterministic regex approach
-        extracted_clauses = extractor.extract_clauses_by_type(pdf_text, clause_types)
-        
-        # Get detailed clause information
-        detailed_clauses = extractor.split_into_clauses(pdf_text)
-        grouped_detailed = extractor.group_clauses_by_type(detailed_clauses)
-        
-        # Prepare response with both simplified and detailed formats
-        response = {
-            'statusCode': 200,
-            'body': {
-                'success': True,
-                'document_info': {
-                    'bucket': bucket,
-                    'key': key,
-                    'text_length': len(pdf_text),
-                    'total_clauses_found': len(detailed_clauses)
-                },
-                'extracted_clauses': extracted_clauses,
-                'detailed_clauses': {
-                    clause_type: [asdict(clause) for clause in clauses]
-                    for clause_type, clauses in grouped_detailed.items()
-                },
-                'processing_metadata': {
-                    'extraction_method': 'regex_deterministic',
-                    'total_clauses_found': len(detailed_clauses),
-                    'clause_types_found': list(grouped_detailed.keys()),
-                    'clause_types_requested': clause_types
+        # Batch mode amortizes cold start and extractor setup across documents
+        if 'keys' in event:
+            keys = event['keys']
+            results = []
+            response_bytes = 0
+            unprocessed_keys = keys[MAX_BATCH_KEYS:]
+            
+            for index, key in enumerate(keys[:MAX_BATCH_KEYS]):
+                try:
+                    result = process_document(bucket, key, clause_types)
+                except Exception as e:
+                    logger.error(f"Error processing document s3://{bucket}/{key}: {str(e)}")
+                    result = batch_error_result(bucket, key, str(e), type(e).__name__)
+                
+                # Measure the result as the runtime will serialize it
+                result_bytes = len(json.dumps(result))
+                if response_bytes + result_bytes > MAX_BATCH_RESPONSE_BYTES:
+                    if results:
+                        # Leave this and the remaining keys for the next call
+                        unprocessed_keys = keys[index:MAX_BATCH_KEYS] + unprocessed_keys
+                        break
+                    
+                    # A single document too large for any batch response
+                    result = batch_error_result(
+                        bucket, key,
+                        f"Result ({result_bytes} bytes) exceeds the batch response limit ({MAX_BATCH_RESPONSE_BYTES} bytes)",
+                        'ResponseTooLarge'
+                    )
+                    result_bytes = len(json.dumps(result))
+                
+                results.append(result)
+                response_bytes += result_bytes
+            
+            logger.info(f"Batch processing completed for {len(results)} documents, {len(unprocessed_keys)} left unprocessed")
+            return {
+                'statusCode': 200,
+                'body': {
+                    'success': True,
+                    'results': results,
+                    'unprocessed_keys': unprocessed_keys
                 }
             }
-        }
         
-        logger.info(f"Document processing completed successfully. Found {len(detailed_clauses)} clauses")
-        return response
+        return {
+            'statusCode': 200,
+            'body': process_document(bucket, event['key'], clause_types)
+        }
         
     except Exception as e:
         logger.error(f"Error processing document: {str(e)}")
@@ -94,7 +126,85 @@ def lambda_handler(event, context):
             }
         }
 
-def extract_text_from_s3_pdf(bucket: str, key: str) -> str:
+def batch_error_result(bucket: str, key: str, error: str, error_type: str) -> Dict:
+    """Build the per-key failure entry used in batch responses"""
+    return {
+        'success': False,
+        'error': error,
+        'error_type': error_type,
+        'document_info': {
+            'bucket': bucket,
+            'key': key
+        }
+    }
+
+def process_document(bucket: str, key: str, clause_types: List[str]) -> Dict:
+    """
+    Extract clauses from a single PDF stored in S3
+    
+    Args:
+        bucket: S3 bucket name
+        key: S3 object key
+        clause_types: Clause types requested by the caller
+        
+    Returns:
+        Response body for the document
+    """
+    logger.info(f"Processing document: s3://{bucket}/{key}")
+    
+    # Download PDF from S3 and extract text
+    pdf_text, num_pages = extract_text_from_s3_pdf(bucket, key)
+    
+    # Short-circuit documents without a usable text layer before regex work
+    if len(pdf_text) < MIN_TEXT_CHARS or len(pdf_text) / max(num_pages, 1) < MIN_CHARS_PER_PAGE:
+        logger.warning(f"No text layer in s3://{bucket}/{key}: {len(pdf_text)} characters over {num_pages} pages, OCR required")
+        return {
+            'success': False,
+            'error': 'no_text_layer',
+            'requires_ocr': True,
+            'document_info': {
+                'bucket': bucket,
+                'key': key,
+                'text_length': len(pdf_text),
+                'num_pages': num_pages
+            }
+        }
+    
+    # Reuse the module-level clause extractor (compiled once per container)
+    extractor = _EXTRACTOR
+    
+    # Extract clauses using deterministic regex approach
+    detailed_clauses = extractor.split_into_clauses(pdf_text)
+    grouped_detailed = extractor.group_clauses_by_type(detailed_clauses)
+    
+    # Prepare response; the document text is sent once and clauses reference
+    # it by [start, end) offsets, so callers slice content and project the
+    # simplified per-type view themselves
+    body = {
+        'success': True,
+        'text': pdf_text,
+        'document_info': {
+            'bucket': bucket,
+            'key': key,
+            'text_length': len(pdf_text),
+            'total_clauses_found': len(detailed_clauses)
+        },
+        'detailed_clauses': {
+            clause_type: [clause_to_dict(clause) for clause in clauses]
+            for clause_type, clauses in grouped_detailed.items()
+        },
+        'processing_metadata': {
+            'extraction_method': 'regex_deterministic',
+            'total_clauses_found': len(detailed_clauses),
+            'clause_types_found': list(grouped_detailed.keys()),
+            'clause_types_requested': clause_types
+        }
+    }
+    
+    logger.info(f"Document processing completed successfully. Found {len(detailed_clauses)} clauses")
+    return body
+
+def extract_text_from_s3_pdf(bucket: str, key: str) -> Tuple[str, int]:
     """
     Extract text from PDF stored in S3
     
@@ -103,33 +213,37 @@ def extract_text_from_s3_pdf(bucket: str, key: str) -> str:
         key: S3 object key
         
     Returns:
-        Extracted text from PDF
+        Tuple of extracted text from PDF and the PDF page count
     """
     try:
-        # Download PDF from S3
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        pdf_content = response['Body'].read()
-        
-        # Extract text using PyPDF2
-        pdf_stream = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_stream)
-        
-        text = ""
-        for page_num, page in enumerate(pdf_reader.pages):
+        # Stream PDF from S3 into /tmp so PyMuPDF reads it from disk
+        # instead of holding a second in-memory copy of the document
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+            s3_client.download_fileobj(bucket, key, pdf_file)
+            pdf_file.flush()
+            
+            # Extract text using PyMuPDF
+            doc = fitz.open(pdf_file.name)
+            num_pages = len(doc)
+            
+            parts = []
             try:
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n--- Page {page_num + 1} ---\n"
-                    text += page_text
-            except Exception as e:
-                logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                continue
+                for page_num, page in enumerate(doc):
+                    try:
+                        page_text = page.get_text("text")
+                        if page_text:
+                            parts.append(f"\n--- Page {page_num + 1} ---\n")
+                            parts.append(page_text)
+                    except Exception as e:
+                        logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
+                        continue
+            finally:
+                doc.close()
         
-        if not text.strip():
-            raise ValueError("No text could be extracted from the PDF")
+        text = "".join(parts).strip()
         
-        logger.info(f"Successfully extracted {len(text)} characters from PDF")
-        return text.strip()
+        logger.info(f"Successfully extracted {len(text)} characters from {num_pages} PDF pages")
+        return text, num_pages
         
     except Exception as e:
         logger.error(f"Error extracting text from S3 PDF: {str(e)}")
@@ -142,18 +256,28 @@ class ClauseExtractor:
         # Enhanced patterns for legal document clause identification
         self.clause_patterns = [
             # Section/Article/Clause with numbers (e.g., "Section 1.1", "Article 5", "Clause 3.2.1")
-            r"(?P<title>(?:Section|Article|Clause|Schedule|Paragraph|Part|Chapter)\s+\d+(?:\.\d+)*(?:\.\d+)*[^\n]*)",
+            r"^[ \t]*(?P<title1>(?:Section|Article|Clause|Schedule|Paragraph|Part|Chapter)\s+(?P<num1>\d+(?:\.\d+)*)[^\n]{0,200})",
             
             # Numbered headings (e.g., "1.", "2.1", "3.2.1")
-            r"(?P<title>\d+(?:\.\d+)*(?:\.\d+)*\.?\s+[A-Z][^\n]*)",
+            r"^[ \t]*(?P<title2>(?P<num2>\d+(?:\.\d+)*)\.?\s+[A-Z][^\n]{0,200})",
             
             # Lettered sections (e.g., "(a)", "(i)", "A.")
-            r"(?P<title>\([a-z]+\)|[A-Z]\.)\s+[^\n]*",
+            r"^[ \t]*(?P<title3>\([a-z]+\)|[A-Z]\.)\s+[^\n]{0,200}",
             
             # Common legal headings without numbers
-            r"(?P<title>(?:WHEREAS|NOW THEREFORE|DEFINITIONS|TERMS AND CONDITIONS|PAYMENT|TERMINATION|LIABILITY|CONFIDENTIALITY|INTELLECTUAL PROPERTY|GOVERNING LAW|DISPUTE RESOLUTION|FORCE MAJEURE|AMENDMENTS|WARRANTIES|REPRESENTATIONS)[^\n]*)"
+            r"^[ \t]*(?P<title4>(?:WHEREAS|NOW THEREFORE|DEFINITIONS|TERMS AND CONDITIONS|PAYMENT|TERMINATION|LIABILITY|CONFIDENTIALITY|INTELLECTUAL PROPERTY|GOVERNING LAW|DISPUTE RESOLUTION|FORCE MAJEURE|AMENDMENTS|WARRANTIES|REPRESENTATIONS)[^\n]{0,200})"
         ]
         
+        # Page markers inserted during PDF extraction (e.g. "--- Page 3 ---")
+        self.page_marker_pattern = r"^[ \t]*(?P<page>---\s*Page\s+(?P<pagenum>\d+)\s*---)"
+        
+        # Single compiled union of the heading and page marker patterns, scanned
+        # in one pass; alternatives are anchored at line starts with bounded tails
+        self._heading_re = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.clause_patterns + [self.page_marker_pattern]),
+            re.IGNORECASE | re.MULTILINE
+        )
+        
         # Clause type classification patterns
         self.clause_type_patterns = {
             "Terms and Conditions": [
@@ -239,43 +363,57 @@ class ClauseExtractor:
                 r"assurances?"
             ]
         }
+        
+        # Single compiled alternation with one named group per clause type;
+        # patterns are lowercase and run over lowercased text, so the scan
+        # can stay case-sensitive
+        self._slug_to_type = {
+            re.sub(r"\W+", "_", clause_type).lower(): clause_type
+            for clause_type in self.clause_type_patterns
+        }
+        self._classify_re = re.compile(
+            "|".join(
+                f"(?P<{slug}>{'|'.join(self.clause_type_patterns[clause_type])})"
+                for slug, clause_type in self._slug_to_type.items()
+            )
+        )
     
     def split_into_clauses(self, text: str) -> List[Clause]:
         """Split legal document text into individual clauses using regex patterns"""
         try:
-            all_matches = []
-            
-            # Find all clause headings using different patterns
-            for pattern in self.clause_patterns:
-                matches = list(re.finditer(pattern, text, flags=re.IGNORECASE | re.MULTILINE))
-                all_matches.extend(matches)
-            
-            # Sort matches by position in text
-            all_matches.sort(key=lambda x: x.start())
-            
-            # Remove duplicate matches (overlapping patterns)
-            unique_matches = self._remove_duplicate_matches(all_matches)
+            # Find all clause headings and page markers in a single pass over the
+            # text; the union yields ordered, non-overlapping matches by construction
+            headings = []
+            current_page = None
+            for match in self._heading_re.finditer(text):
+                if match.lastgroup == "page":
+                    current_page = match.group("pagenum")
+                else:
+                    # Each heading is tagged with the page it appears on
+                    headings.append((match, current_page))
             
             clauses = []
-            for i, match in enumerate(unique_matches):
-                start = match.start()
-                end = unique_matches[i + 1].start() if i + 1 < len(unique_matches) else len(text)
-                
-                title = match.group("title").strip() if "title" in match.groupdict() else match.group(0).strip()
-                content = text[start:end].strip()
+            for i, (match, page_reference) in enumerate(headings):
+                # Title groups begin at the first non-blank character of the
+                # heading; trim trailing whitespace by offset so clauses can
+                # reference the document text without copying it
+                start = match.start(match.lastgroup)
+                end = headings[i + 1][0].start() if i + 1 < len(headings) else len(text)
+                while end > start and text[end - 1].isspace():
+                    end -= 1
                 
-                # Extract section number if present
-                section_number = self._extract_section_number(title)
+                title = match.group(match.lastgroup).strip()
                 
-                # Classify clause type
-                clause_type = self._classify_clause_type(title, content)
+                # Section number comes from the numbered heading alternatives
+                section_number = match.group("num1") or match.group("num2")
                 
-                # Extract page reference if present
-                page_reference = self._extract_page_reference(content)
+                # Classify clause type from the title and opening of the clause
+                clause_type = self._classify_clause_type(title, text[start:min(end, start + 500)])
                 
                 clause = Clause(
                     clause_name=title,
-                    content=content,
+                    start=start,
+                    end=end,
                     clause_type=clause_type,
                     section_number=section_number,
                     page_reference=page_reference
@@ -290,51 +428,13 @@ class ClauseExtractor:
             logger.error(f"Error splitting document into clauses: {str(e)}")
             raise
     
-    def _remove_duplicate_matches(self, matches: List) -> List:
-        """Remove overlapping or duplicate matches"""
-        if not matches:
-            return matches
-        
-        unique_matches = [matches[0]]
-        
-        for match in matches[1:]:
-            # Check if this match overlaps significantly with the last unique match
-            last_match = unique_matches[-1]
-            
-            if match.start() >= last_match.end() - 10:  # Allow small overlap
-                unique_matches.append(match)
-        
-        return unique_matches
-    
-    def _extract_section_number(self, title: str) -> Optional[str]:
-        """Extract section number from clause title"""
-        try:
-            number_pattern = r"(\d+(?:\.\d+)*(?:\.\d+)*)"
-            match = re.search(number_pattern, title)
-            return match.group(1) if match else None
-        except Exception:
-            return None
-    
     def _classify_clause_type(self, title: str, content: str) -> Optional[str]:
         """Classify clause type based on title and content"""
         try:
             text_to_analyze = (title + " " + content[:500]).lower()
             
-            for clause_type, patterns in self.clause_type_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, text_to_analyze, re.IGNORECASE):
-                        return clause_type
-            
-            return None
-        except Exception:
-            return None
-    
-    def _extract_page_reference(self, content: str) -> Optional[str]:
-        """Extract page reference from clause content"""
-        try:
-            page_pattern = r"---\s*Page\s+(\d+)\s*---"
-            match = re.search(page_pattern, content)
-            return match.group(1) if match else None
+            match = self._classify_re.search(text_to_analyze)
+            return self._slug_to_type[match.lastgroup] if match else None
         except Exception:
             return None
     
@@ -352,11 +452,12 @@ class ClauseExtractor:
         
         return grouped_clauses
     
-    def extract_clauses_by_type(self, text: str, target_clause_types: List[str] = None) -> Dict[str, List[str]]:
+    def extract_clauses_by_type(self, text: str, target_clause_types: List[str] = None, clauses: Optional[List[Clause]] = None) -> Dict[str, List[str]]:
         """Extract and group clauses by type, returning simplified format"""
         try:
-            # Split document into clauses
-            clauses = self.split_into_clauses(text)
+            # Split document into clauses unless the caller already has them
+            if clauses is None:
+                clauses = self.split_into_clauses(text)
             
             # Group by type
             grouped_clauses = self.group_clauses_by_type(clauses)
@@ -368,16 +469,19 @@ class ClauseExtractor:
             
             for clause_type in target_types:
                 if clause_type in grouped_clauses:
-                    result[clause_type] = [clause.content for clause in grouped_clauses[clause_type]]
+                    result[clause_type] = [text[clause.start:clause.end] for clause in grouped_clauses[clause_type]]
                 else:
                     result[clause_type] = []
             
             # Also include unclassified clauses if no specific types requested
             if not target_clause_types and "Unclassified" in grouped_clauses:
-                result["Unclassified"] = [clause.content for clause in grouped_clauses["Unclassified"]]
+                result["Unclassified"] = [text[clause.start:clause.end] for clause in grouped_clauses["Unclassified"]]
             
             return result
             
         except Exception as e:
             logger.error(f"Error extracting clauses by type: {str(e)}")
             raise
+
+# Build the extractor once at import so warm invocations reuse compiled patterns
+_EXTRACTOR = ClauseExtractor()
@@ -51,7 +51,7 @@ class LambdaProcessor:
             response = self.lambda_client.invoke(
                 FunctionName=self.config.LAMBDA_FUNCTION_NAME,
                 InvocationType='RequestResponse',  # Synchronous invocation
-                Payload=json.dumps(payload)
+                Payload=json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
             )
             
             # Parse response
@@ -61,6 +61,9 @@ class LambdaProcessor:
                 if 'errorMessage' in response_payload:
                     raise Exception(f"Lambda execution error: {response_payload['errorMessage']}")
                 
+                # Lambda returns clause offsets; rebuild content and the simplified view
+                self._expand_clause_content(response_payload.get('body', {}), payload['clause_types'])
+                
                 logger.info("Successfully processed document via Lambda")
                 return response_payload
             else:
@@ -70,6 +73,107 @@ class LambdaProcessor:
             logger.error(f"Error invoking Lambda function: {str(e)}")
             raise
     
+    def invoke_document_processor_batch(self, s3_bucket: str, s3_keys: List[str]) -> Dict:
+        """
+        Invoke Lambda function to process several legal documents
+        
+        Each result carries the full document text, so the Lambda caps one
+        batch response at 25 documents and ~5 MB (under Lambda's 6 MB
+        synchronous response limit) and returns the remaining keys as
+        body['unprocessed_keys']. This method re-invokes with those keys
+        until every document has a result.
+        
+        Args:
+            s3_bucket: S3 bucket name where documents are stored
+            s3_keys: S3 keys of the documents
+            
+        Returns:
+            Dictionary with one processing result per document under body['results']
+        """
+        try:
+            results = []
+            pending_keys = list(s3_keys)
+            
+            while pending_keys:
+                payload = {
+                    'bucket': s3_bucket,
+                    'keys': pending_keys,
+                    'clause_types': self.config.CLAUSE_TYPES
+                }
+                
+                response = self.lambda_client.invoke(
+                    FunctionName=self.config.LAMBDA_FUNCTION_NAME,
+                    InvocationType='RequestResponse',  # Synchronous invocation
+                    Payload=json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+                )
+                
+                # Parse response
+                response_payload = json.loads(response['Payload'].read())
+                
+                if response['StatusCode'] != 200:
+                    raise Exception(f"Lambda invocation failed with status code: {response['StatusCode']}")
+                
+                if 'errorMessage' in response_payload:
+                    raise Exception(f"Lambda execution error: {response_payload['errorMessage']}")
+                
+                body = response_payload.get('body', {})
+                batch_results = body.get('results', [])
+                if not batch_results:
+                    raise Exception(f"Lambda returned no results for {len(pending_keys)} pending documents")
+                
+                for result in batch_results:
+                    self._expand_clause_content(result, payload['clause_types'])
+                results.extend(batch_results)
+                
+                pending_keys = body.get('unprocessed_keys', [])
+            
+            logger.info(f"Successfully processed {len(s3_keys)} documents via Lambda")
+            return {
+                'statusCode': 200,
+                'body': {
+                    'success': True,
+                    'results': results
+                }
+            }
+                
+        except Exception as e:
+            logger.error(f"Error invoking Lambda function for batch: {str(e)}")
+            raise
+    
+    def _expand_clause_content(self, body: Dict, clause_types: List[str]):
+        """Slice clause content from the document text and add the extracted_clauses view"""
+        if not body.get('success') or 'text' not in body:
+            return
+        
+        text = body['text']
+        for clauses in body.get('detailed_clauses', {}).values():
+            for clause in clauses:
+                clause['content'] = text[clause['start']:clause['end']]
+        
+        if 'extracted_clauses' not in body:
+            body['extracted_clauses'] = self._project_extracted_clauses(
+                body.get('detailed_clauses', {}),
+                clause_types
+            )
+    
+    def _project_extracted_clauses(self, detailed_clauses: Dict[str, List[Dict]], clause_types: List[str]) -> Dict[str, List[str]]:
+        """
+        Build the simplified clause type -> content mapping from detailed clauses
+        
+        Args:
+            detailed_clauses: Dictionary mapping clause types to clause dictionaries
+            clause_types: Clause types requested from the Lambda function
+            
+        Returns:
+            Dictionary mapping clause types to lists of clause content
+        """
+        target_types = clause_types or list(detailed_clauses.keys())
+        
+        return {
+            clause_type: [clause['content'] for clause in detailed_clauses.get(clause_type, [])]
+            for clause_type in target_types
+        }
+    
     def invoke_document_processor_async(self, s3_bucket: str, s3_key: str, callback_url: Optional[str] = None) -> str:
         """
         Invoke Lambda function asynchronously to process legal document
@@ -93,7 +197,7 @@ class LambdaProcessor:
             response = self.lambda_client.invoke(
                 FunctionName=self.config.LAMBDA_FUNCTION_NAME,
                 InvocationType='Event',  # Asynchronous invocation
-                Payload=json.dumps(payload)
+                Payload=json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
             )
             
             if response['StatusCode'] == 202:  # Accepted for async processing
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """On-disk cache of LLM responses keyed by a SHA-256 of model and prompt"""
+    
+    def __init__(self, cache_dir: str = "data/llm_cache", ttl_seconds: int = 7 * 24 * 3600):
+        """
+        Initialize LLM response cache
+        
+        Args:
+            cache_dir: Directory holding cached responses
+            ttl_seconds: Age after which cached responses are ignored (default: 7 days)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+    
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        """Build the cache key for a model/prompt pair"""
+        return hashlib.sha256((model_name + "\0" + prompt).encode("utf-8")).hexdigest()
+    
+    def _path_for(self, key: str) -> Path:
+        """Shard entries by key prefix to keep directories small"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached response
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Cached response, or None if missing, unreadable or expired
+        """
+        path = self._path_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry {key}: {str(e)}")
+            return None
+        
+        if time.time() - entry.get("ts", 0) > self.ttl_seconds:
+            # Drop expired entries so the cache directory does not grow forever
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        
+        return entry.get("response")
+    
+    def set(self, key: str, response: str):
+        """
+        Store a response in the cache
+        
+        Args:
+            key: Cache key from make_key
+            response: LLM response text
+        """
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Write to a private temp file and rename so concurrent chunk
+            # workers never observe a partially written entry
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"response": response, "ts": time.time()}, file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        
+        except OSError as e:
+            logger.warning(f"Could not write LLM cache entry {key}: {str(e)}")
@@ -4,16 +4,65 @@ Local LLM-based clause extractor using Ollama
 Fast, reliable, and runs entirely on your machine
 """
 
-import json
 import logging
-import requests
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import orjson
+import re
+import concurrent.futures
+import itertools
+from typing import List, Dict, Iterator, Optional
+from dataclasses import dataclass, replace
 import time
+from config import Config
+from llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Section boundaries used to split large documents into chunks
+_SECTION_SPLIT_RE = re.compile(r'\n(?=(?:Section|Article|Clause|SECTION|ARTICLE|CLAUSE|\d+\.)\s)')
+
+# Generation budget bounds; the model echoes clause text, so the budget
+# scales with the input size instead of always allowing the maximum
+MAX_PREDICT_TOKENS = 2048
+MIN_PREDICT_TOKENS = 256
+
+# Static clause extraction instructions; kept byte-identical across calls so
+# the instruction tokens hit Ollama's prompt cache
+_PROMPT_PREFIX = """You are a legal expert. Analyze this legal document and extract all distinct clauses, sections, or provisions.
+
+For each clause, provide:
+1. Clause name/title 
+2. Complete text content
+
+Return ONLY a JSON object in this exact format:
+{
+  "clauses": [
+    {
+      "clause_name": "Section 1. Definitions",
+      "content": "Complete text of the definitions section..."
+    },
+    {
+      "clause_name": "Payment Terms", 
+      "content": "Complete text of the payment terms..."
+    }
+  ]
+}
+
+Rules:
+- Extract meaningful legal provisions, not individual words
+- Use original headings when available
+- Include full clause text
+- Return valid JSON only
+
+Document:
+"""
+_PROMPT_SUFFIX = """
+
+JSON:"""
+
+# How long Ollama keeps the model (and its prompt cache) loaded between calls
+OLLAMA_KEEP_ALIVE = "30m"
+
+@dataclass(slots=True, frozen=True)
 class SimpleClause:
     """Data class representing a legal clause"""
     clause_name: str
@@ -22,22 +71,42 @@ class SimpleClause:
 class LocalLLMExtractor:
     """Local LLM-based clause extractor using Ollama"""
     
-    def __init__(self, model_name: str = "llama3.2:3b"):
+    def __init__(self, model_name: str = "llama3.2:3b", max_parallel: Optional[int] = None, use_cache: Optional[bool] = None):
         """
         Initialize local LLM extractor
         
         Args:
             model_name: Ollama model to use (default: llama3.2:3b for speed)
+            max_parallel: Max concurrent chunk requests (default: Config.OLLAMA_NUM_PARALLEL)
+            use_cache: Reuse cached responses for identical prompts (default: Config.LLM_CACHE_ENABLED)
         """
         self.model_name = model_name
         self.base_url = "http://localhost:11434"
+        self.max_parallel = max_parallel or Config.OLLAMA_NUM_PARALLEL
+        
+        # Prompt-keyed response cache; re-analyzing a document skips generation
+        llm_cache_enabled = Config.LLM_CACHE_ENABLED if use_cache is None else use_cache
+        self.cache = LLMCache(Config.LLM_CACHE_DIR, Config.LLM_CACHE_TTL_DAYS * 24 * 3600) if llm_cache_enabled else None
+        
+        # Reuse keep-alive connections to Ollama across calls and chunk workers;
+        # requests is only imported once an extractor is actually created
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=self.max_parallel, max_retries=0))
+        
         self._check_ollama_connection()
     
+    def close(self):
+        """Close pooled HTTP connections to Ollama"""
+        self.session.close()
+    
     def _check_ollama_connection(self):
         """Check if Ollama is running and model is available"""
         try:
             # Check if Ollama is running
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code != 200:
                 raise ConnectionError("Ollama is not running")
             
@@ -57,14 +126,14 @@ class LocalLLMExtractor:
             logger.info("To use local LLM processing:")
             logger.info("1. Install Ollama: https://ollama.ai")
             logger.info("2. Run: ollama pull llama3.2:3b")
-            logger.info("3. Start Ollama service")
+            logger.info("3. Start Ollama service (set OLLAMA_NUM_PARALLEL to process chunks concurrently)")
             raise
     
     def _pull_model(self):
         """Pull the model if it's not available"""
         try:
             logger.info(f"Pulling model {self.model_name}...")
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/pull",
                 json={"name": self.model_name},
                 timeout=300  # 5 minutes for model download
@@ -99,7 +168,7 @@ class LocalLLMExtractor:
             else:
                 # Small document, process normally
                 prompt = self._create_clause_extraction_prompt(text)
-                response = self._call_local_llm(prompt)
+                response = self._call_local_llm(prompt, self._num_predict_for(text))
                 extracted_clauses = self._parse_llm_response(response)
                 
                 elapsed = time.time() - start_time
@@ -111,34 +180,21 @@ class LocalLLMExtractor:
             raise
     
     def _extract_clauses_chunked(self, text: str) -> List[SimpleClause]:
-        """Process large documents in chunks"""
+        """Process large documents in chunks with concurrent LLM calls"""
         try:
-            # Split into 8k chunks for local processing
-            chunks = self._split_into_chunks(text, max_size=8000)
-            logger.info(f"Split document into {len(chunks)} chunks (~8k each)")
-            
-            all_clauses = []
-            
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Processing chunk {i+1}/{len(chunks)} ({len(chunk)} chars)")
+            # Chunk calls are I/O-bound on the Ollama HTTP round-trip, so run them
+            # concurrently, capped at the server's parallel request slots. Chunks
+            # are submitted as the splitter yields them, so the first LLM calls
+            # start while the rest of the document is still being split
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+                futures = [
+                    executor.submit(self._process_single_chunk, chunk_idx, chunk)
+                    for chunk_idx, chunk in enumerate(self._split_into_chunks(text, max_size=8000))
+                ]
+                logger.info(f"Split document into {len(futures)} chunks (~8k each)")
                 
-                try:
-                    start_time = time.time()
-                    prompt = self._create_clause_extraction_prompt(chunk)
-                    response = self._call_local_llm(prompt)
-                    chunk_clauses = self._parse_llm_response(response)
-                    
-                    # Add chunk info to clause names for tracking
-                    for clause in chunk_clauses:
-                        clause.clause_name = f"[Chunk {i+1}] {clause.clause_name}"
-                    
-                    all_clauses.extend(chunk_clauses)
-                    elapsed = time.time() - start_time
-                    logger.info(f"Chunk {i+1} extracted {len(chunk_clauses)} clauses in {elapsed:.1f}s")
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing chunk {i+1}: {str(e)}")
-                    continue
+                # Collect in chunk order regardless of completion order
+                all_clauses = [clause for future in futures for clause in future.result()]
             
             logger.info(f"Total clauses extracted from all chunks: {len(all_clauses)}")
             return all_clauses
@@ -147,110 +203,124 @@ class LocalLLMExtractor:
             logger.error(f"Error in chunked processing: {str(e)}")
             raise
     
-    def _split_into_chunks(self, text: str, max_size: int = 8000) -> List[str]:
-        """Split text into chunks while preserving boundaries"""
+    def _process_single_chunk(self, chunk_idx: int, chunk: str) -> List[SimpleClause]:
+        """Process a single chunk (for concurrent execution)"""
         try:
-            # Try to split on section boundaries first
-            import re
-            section_pattern = r'\n(?=(?:Section|Article|Clause|SECTION|ARTICLE|CLAUSE|\d+\.)\s)'
-            sections = re.split(section_pattern, text)
-            
-            chunks = []
-            current_chunk = ""
-            
-            for section in sections:
-                # If adding this section would exceed max size
-                if len(current_chunk) + len(section) > max_size and current_chunk:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = section
-                else:
-                    current_chunk += section
+            logger.info(f"Processing chunk {chunk_idx+1} ({len(chunk)} chars)")
             
-            # Add the last chunk
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
+            start_time = time.time()
+            prompt = self._create_clause_extraction_prompt(chunk)
+            response = self._call_local_llm(prompt, self._num_predict_for(chunk))
             
-            # If chunks are still too large, split by paragraphs
-            final_chunks = []
-            for chunk in chunks:
-                if len(chunk) <= max_size:
-                    final_chunks.append(chunk)
-                else:
-                    # Split large chunks by double newlines
-                    paragraphs = chunk.split('\n\n')
-                    temp_chunk = ""
-                    
-                    for para in paragraphs:
-                        if len(temp_chunk) + len(para) > max_size and temp_chunk:
-                            final_chunks.append(temp_chunk.strip())
-                            temp_chunk = para
-                        else:
-                            temp_chunk += "\n\n" + para if temp_chunk else para
-                    
-                    if temp_chunk.strip():
-                        final_chunks.append(temp_chunk.strip())
-            
-            return final_chunks
+            # Add chunk info to clause names for tracking
+            chunk_clauses = [
+                replace(clause, clause_name=f"[Chunk {chunk_idx+1}] {clause.clause_name}")
+                for clause in self._parse_llm_response(response)
+            ]
+            
+            elapsed = time.time() - start_time
+            logger.info(f"Chunk {chunk_idx+1} extracted {len(chunk_clauses)} clauses in {elapsed:.1f}s")
+            return chunk_clauses
             
         except Exception as e:
-            logger.error(f"Error splitting text into chunks: {str(e)}")
-            # Fallback: simple character-based splitting
-            chunks = []
-            for i in range(0, len(text), max_size):
-                chunks.append(text[i:i + max_size])
-            return chunks
+            logger.warning(f"Error processing chunk {chunk_idx+1}: {str(e)}")
+            return []
+    
+    def _split_into_chunks(self, text: str, max_size: int = 8000) -> Iterator[str]:
+        """Yield chunks of text while preserving section and paragraph boundaries"""
+        # Walk section boundaries in one pass; the current chunk is held as a
+        # list of its sections and only joined when it is emitted
+        sections = []
+        chunk_len = 0
+        section_start = 0
+        boundaries = itertools.chain(
+            ((match.start(), match.end()) for match in _SECTION_SPLIT_RE.finditer(text)),
+            [(len(text), len(text))]
+        )
+        
+        for section_end, next_start in boundaries:
+            section = text[section_start:section_end]
+            section_start = next_start
+            
+            # If adding this section would exceed max size
+            if chunk_len + len(section) > max_size and chunk_len:
+                yield from self._split_oversized_chunk("".join(sections).strip(), max_size)
+                sections = [section]
+                chunk_len = len(section)
+            else:
+                sections.append(section)
+                chunk_len += len(section)
+        
+        # Add the last chunk
+        last_chunk = "".join(sections).strip()
+        if last_chunk:
+            yield from self._split_oversized_chunk(last_chunk, max_size)
+    
+    def _split_oversized_chunk(self, chunk: str, max_size: int) -> Iterator[str]:
+        """Yield a chunk as is, or split by paragraphs if it is still too large"""
+        if len(chunk) <= max_size:
+            yield chunk
+            return
+        
+        # Scan double-newline paragraph breaks by offset instead of splitting
+        temp_chunk = ""
+        para_start = 0
+        
+        while para_start is not None:
+            para_end = chunk.find('\n\n', para_start)
+            if para_end == -1:
+                para = chunk[para_start:]
+                para_start = None
+            else:
+                para = chunk[para_start:para_end]
+                para_start = para_end + 2
+            
+            if len(temp_chunk) + len(para) > max_size and temp_chunk:
+                yield temp_chunk.strip()
+                temp_chunk = para
+            else:
+                temp_chunk += "\n\n" + para if temp_chunk else para
+        
+        if temp_chunk.strip():
+            yield temp_chunk.strip()
     
     def _create_clause_extraction_prompt(self, text: str) -> str:
         """Create a prompt for local LLM to extract legal clauses"""
-        
-        prompt = f"""You are a legal expert. Analyze this legal document and extract all distinct clauses, sections, or provisions.
-
-For each clause, provide:
-1. Clause name/title 
-2. Complete text content
-
-Return ONLY a JSON array in this exact format:
-[
-  {{
-    "clause_name": "Section 1. Definitions",
-    "content": "Complete text of the definitions section..."
-  }},
-  {{
-    "clause_name": "Payment Terms", 
-    "content": "Complete text of the payment terms..."
-  }}
-]
-
-Rules:
-- Extract meaningful legal provisions, not individual words
-- Use original headings when available
-- Include full clause text
-- Return valid JSON only
-
-Document:
-{text}
-
-JSON array:"""
-
-        return prompt
+        # Only the document varies between prompts, so Ollama can reuse the
+        # KV cache for the shared instruction prefix across chunks
+        return _PROMPT_PREFIX + text + _PROMPT_SUFFIX
     
-    def _call_local_llm(self, prompt: str) -> str:
-        """Call local LLM via Ollama API"""
+    def _num_predict_for(self, text: str) -> int:
+        """Token budget for extracting clauses from text (~4 chars per token, 2x headroom)"""
+        return max(MIN_PREDICT_TOKENS, min(MAX_PREDICT_TOKENS, len(text) // 2))
+    
+    def _call_local_llm(self, prompt: str, num_predict: int = MAX_PREDICT_TOKENS) -> str:
+        """Call local LLM via Ollama API with JSON-constrained output"""
         try:
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.make_key(self.model_name, prompt)
+                cached_response = self.cache.get(cache_key)
+                if cached_response is not None:
+                    logger.info(f"Using cached local LLM response ({self.model_name})")
+                    return cached_response
+            
             payload = {
                 "model": self.model_name,
                 "prompt": prompt,
                 "stream": False,
+                "format": "json",  # Grammar-constrained decoding, always valid JSON
+                "keep_alive": OLLAMA_KEEP_ALIVE,
                 "options": {
                     "temperature": 0.1,
                     "top_p": 0.9,
-                    "num_predict": 2048  # Max tokens
+                    "num_predict": num_predict  # Max tokens
                 }
             }
             
             logger.info(f"Calling local LLM ({self.model_name})")
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 timeout=60  # 1 minute timeout for local processing
@@ -260,24 +330,49 @@ JSON array:"""
                 raise Exception(f"LLM API error: {response.status_code} - {response.text}")
             
             result = response.json()
-            return result.get("response", "")
+            llm_response = result.get("response", "")
+            
+            # Only cache responses that parse into a non-empty clause list; an
+            # empty, truncated or malformed generation is retried next time
+            # instead of being replayed for the whole TTL
+            if cache_key:
+                try:
+                    if not self._load_clause_records(llm_response):
+                        raise ValueError("LLM response contains no clauses")
+                except ValueError as e:
+                    logger.warning(f"Not caching local LLM response: {str(e)}")
+                else:
+                    self.cache.set(cache_key, llm_response)
+            
+            return llm_response
             
         except Exception as e:
             logger.error(f"Error calling local LLM: {str(e)}")
             raise
     
+    def _load_clause_records(self, response: str) -> list:
+        """Decode the clause array from an LLM JSON response, raising ValueError if there is none"""
+        # JSON mode guarantees the whole response is JSON; accept a bare
+        # array, an object wrapping the clause array, or a single clause object
+        parsed_response = orjson.loads(response)
+        
+        if isinstance(parsed_response, dict):
+            if 'clause_name' in parsed_response or 'content' in parsed_response:
+                parsed_response = [parsed_response]
+            else:
+                parsed_response = parsed_response.get('clauses') or next(
+                    (value for value in parsed_response.values() if isinstance(value, list)), None
+                )
+        
+        if not isinstance(parsed_response, list):
+            raise ValueError("No clause array found in LLM response")
+        
+        return parsed_response
+    
     def _parse_llm_response(self, response: str) -> List[SimpleClause]:
         """Parse LLM JSON response into SimpleClause objects"""
         try:
-            # Extract JSON from response
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No valid JSON array found in LLM response")
-            
-            json_str = response[start_idx:end_idx]
-            parsed_response = json.loads(json_str)
+            parsed_response = self._load_clause_records(response)
             
             clauses = []
             
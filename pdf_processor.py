@@ -1,11 +1,62 @@
-import PyPDF2
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Optional
 from pathlib import Path
-import io
 
 logger = logging.getLogger(__name__)
 
+# PyMuPDF is imported inside the functions that open documents so that
+# importing this module (e.g. for validate_pdf's cheap checks) stays fast
+
+# Minimum pages per worker process. Documents with fewer than twice this many
+# pages (or on a single core) are extracted in-process, where the cost of
+# starting worker processes would outweigh the parallel speedup
+PARALLEL_MIN_PAGES = 8
+
+def _extract_pages(doc, start: int, stop: int) -> List[str]:
+    """
+    Extract page markers and text for pages [start, stop) of an open document
+    
+    Args:
+        doc: Open PyMuPDF document
+        start: First page index (inclusive)
+        stop: Last page index (exclusive)
+        
+    Returns:
+        List of alternating page markers and page texts
+    """
+    parts = []
+    for page_num in range(start, stop):
+        try:
+            page_text = doc[page_num].get_text()
+            if page_text:
+                parts.append(f"\n--- Page {page_num + 1} ---\n")
+                parts.append(page_text)
+        except Exception as e:
+            logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
+            continue
+    return parts
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract page markers and text for pages [start, stop) of a PDF
+    
+    Runs in worker processes, so it reopens the document itself.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        start: First page index (inclusive)
+        stop: Last page index (exclusive)
+        
+    Returns:
+        List of alternating page markers and page texts
+    """
+    import fitz
+    
+    with fitz.open(pdf_path) as doc:
+        return _extract_pages(doc, start, stop)
+
 class PDFProcessor:
     """Class for processing PDF documents and extracting text"""
     
@@ -28,20 +79,26 @@ class PDFProcessor:
             if file_size_mb > self.max_size_mb:
                 raise ValueError(f"PDF file size ({file_size_mb:.2f} MB) exceeds maximum allowed size ({self.max_size_mb} MB)")
             
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
+            import fitz
+            
+            with fitz.open(pdf_path) as doc:
+                num_pages = doc.page_count
                 
-                # Extract text from each page
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += f"\n--- Page {page_num + 1} ---\n"
-                            text += page_text
-                    except Exception as e:
-                        logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                        continue
+                # Each worker gets at least PARALLEL_MIN_PAGES pages; small
+                # documents are extracted from the handle already open here
+                workers = min(os.cpu_count() or 1, num_pages // PARALLEL_MIN_PAGES)
+                if workers <= 1:
+                    parts = _extract_pages(doc, 0, num_pages)
+            
+            if workers > 1:
+                # Split pages into one contiguous range per worker; map keeps
+                # the ranges in order so the joined text matches sequential output
+                bounds = [num_pages * i // workers for i in range(workers + 1)]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    ranges = executor.map(_extract_page_range, [pdf_path] * workers, bounds[:-1], bounds[1:])
+                    parts = [part for range_parts in ranges for part in range_parts]
+            
+            text = "".join(parts)
             
             if not text.strip():
                 raise ValueError("No text could be extracted from the PDF")
@@ -69,20 +126,22 @@ class PDFProcessor:
             if size_mb > self.max_size_mb:
                 raise ValueError(f"PDF size ({size_mb:.2f} MB) exceeds maximum allowed size ({self.max_size_mb} MB)")
             
-            text = ""
-            pdf_stream = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_stream)
-            
-            # Extract text from each page
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += f"\n--- Page {page_num + 1} ---\n"
-                        text += page_text
-                except Exception as e:
-                    logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                    continue
+            import fitz
+            
+            parts = []
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+                # Extract text from each page
+                for page_num, page in enumerate(doc):
+                    try:
+                        page_text = page.get_text()
+                        if page_text:
+                            parts.append(f"\n--- Page {page_num + 1} ---\n")
+                            parts.append(page_text)
+                    except Exception as e:
+                        logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
+                        continue
+            
+            text = "".join(parts)
             
             if not text.strip():
                 raise ValueError("No text could be extracted from the PDF")
@@ -107,31 +166,35 @@ class PDFProcessor:
         try:
             file_path = Path(pdf_path)
             
-            if not file_path.exists():
+            # A single stat both checks existence and gives the size
+            try:
+                file_stat = file_path.stat()
+            except FileNotFoundError:
                 return {"valid": False, "error": "File does not exist"}
             
             if not file_path.suffix.lower() == '.pdf':
                 return {"valid": False, "error": "File is not a PDF"}
             
-            file_size_mb = file_path.stat().st_size / (1024 * 1024)
+            file_size_mb = file_stat.st_size / (1024 * 1024)
+            
+            import fitz
             
-            with open(pdf_path, 'rb') as file:
-                try:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    num_pages = len(pdf_reader.pages)
+            try:
+                with fitz.open(pdf_path) as doc:
+                    num_pages = doc.page_count
                     
                     metadata = {
                         "valid": True,
                         "file_size_mb": round(file_size_mb, 2),
                         "num_pages": num_pages,
                         "file_path": str(file_path),
-                        "metadata": pdf_reader.metadata if pdf_reader.metadata else {}
+                        "metadata": doc.metadata if doc.metadata else {}
                     }
                     
                     return metadata
                     
-                except Exception as e:
-                    return {"valid": False, "error": f"Invalid PDF format: {str(e)}"}
+            except Exception as e:
+                return {"valid": False, "error": f"Invalid PDF format: {str(e)}"}
                     
         except Exception as e:
             return {"valid": False, "error": f"Error validating PDF: {str(e)}"}
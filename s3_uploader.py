@@ -1,5 +1,6 @@
-import boto3
+import io
 import logging
+import threading
 from typing import Dict, Optional
 from pathlib import Path
 import uuid
@@ -7,30 +8,70 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Multipart settings for PDF uploads: files above 8 MB go up in 8 MB parts
+# sent over up to 10 parallel connections
+TRANSFER_SETTINGS = {
+    'multipart_threshold': 8 * 1024 * 1024,
+    'multipart_chunksize': 8 * 1024 * 1024,
+    'max_concurrency': 10,
+    'use_threads': True
+}
+
 class S3Uploader:
     """Class for uploading PDF documents to S3 for Lambda processing"""
     
+    # Shared by all instances in the process; boto3 clients are thread-safe.
+    # boto3 is imported when the first client is built, not at module import
+    _s3_client = None
+    _transfer_config = None
+    _client_lock = threading.Lock()
+    
     def __init__(self):
         self.config = Config()
-        self.s3_client = None
         self.bucket_name = self.config.S3_BUCKET_NAME
-        self._initialize_s3()
+        self.s3_client = type(self)._get_client(self.config)
+        self.transfer_config = type(self)._transfer_config
     
-    def _initialize_s3(self):
-        """Initialize S3 client"""
-        try:
-            session = boto3.Session(
-                aws_access_key_id=self.config.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=self.config.AWS_SECRET_ACCESS_KEY,
-                region_name=self.config.AWS_REGION
-            )
-            
-            self.s3_client = session.client('s3')
-            logger.info("Successfully initialized S3 client")
+    @classmethod
+    def _get_client(cls, config: Config):
+        """
+        Get the shared S3 client, creating it on first use
+        
+        Args:
+            config: Application config holding AWS credentials and region
             
-        except Exception as e:
-            logger.error(f"Error initializing S3: {str(e)}")
-            raise
+        Returns:
+            boto3 S3 client
+        """
+        if cls._s3_client is None:
+            with cls._client_lock:
+                if cls._s3_client is None:
+                    try:
+                        import boto3
+                        from boto3.s3.transfer import TransferConfig
+                        from botocore.config import Config as BotoConfig
+                        
+                        session = boto3.Session(
+                            aws_access_key_id=config.AWS_ACCESS_KEY_ID,
+                            aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+                            region_name=config.AWS_REGION
+                        )
+                        
+                        cls._s3_client = session.client(
+                            's3',
+                            config=BotoConfig(
+                                max_pool_connections=50,
+                                retries={'max_attempts': 3, 'mode': 'adaptive'}
+                            )
+                        )
+                        cls._transfer_config = TransferConfig(**TRANSFER_SETTINGS)
+                        logger.info("Successfully initialized S3 client")
+                        
+                    except Exception as e:
+                        logger.error(f"Error initializing S3: {str(e)}")
+                        raise
+        
+        return cls._s3_client
     
     def upload_pdf_file(self, pdf_path: str, custom_key: Optional[str] = None) -> Dict[str, str]:
         """
@@ -46,7 +87,10 @@ class S3Uploader:
         try:
             file_path = Path(pdf_path)
             
-            if not file_path.exists():
+            # A single stat both checks existence and gives the size for the result
+            try:
+                file_stat = file_path.stat()
+            except FileNotFoundError:
                 raise ValueError(f"PDF file not found: {pdf_path}")
             
             if not file_path.suffix.lower() == '.pdf':
@@ -59,20 +103,20 @@ class S3Uploader:
                 unique_id = str(uuid.uuid4())
                 s3_key = f"legal-documents/{unique_id}/{file_path.name}"
             
-            # Upload file
-            with open(pdf_path, 'rb') as file:
-                self.s3_client.upload_fileobj(
-                    file,
-                    self.bucket_name,
-                    s3_key,
-                    ExtraArgs={
-                        'ContentType': 'application/pdf',
-                        'Metadata': {
-                            'original_name': file_path.name,
-                            'upload_type': 'legal_document'
-                        }
+            # Upload file; the transfer manager reads the parts from disk itself
+            self.s3_client.upload_file(
+                Filename=str(file_path),
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                ExtraArgs={
+                    'ContentType': 'application/pdf',
+                    'Metadata': {
+                        'original_name': file_path.name,
+                        'upload_type': 'legal_document'
                     }
-                )
+                },
+                Config=self.transfer_config
+            )
             
             # Generate pre-signed URL for download
             download_url = self.s3_client.generate_presigned_url(
@@ -86,7 +130,7 @@ class S3Uploader:
                 'bucket': self.bucket_name,
                 's3_key': s3_key,
                 'download_url': download_url,
-                'file_size': file_path.stat().st_size,
+                'file_size': file_stat.st_size,
                 'original_name': file_path.name
             }
             
@@ -117,16 +161,20 @@ class S3Uploader:
                 unique_id = str(uuid.uuid4())
                 s3_key = f"legal-documents/{unique_id}/{filename}"
             
-            # Upload bytes
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=pdf_bytes,
-                ContentType='application/pdf',
-                Metadata={
-                    'original_name': filename,
-                    'upload_type': 'legal_document'
-                }
+            # Upload bytes through the transfer manager so large documents
+            # are sent as parallel multipart chunks
+            self.s3_client.upload_fileobj(
+                io.BytesIO(pdf_bytes),
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={
+                    'ContentType': 'application/pdf',
+                    'Metadata': {
+                        'original_name': filename,
+                        'upload_type': 'legal_document'
+                    }
+                },
+                Config=self.transfer_config
             )
             
             # Generate pre-signed URL for download
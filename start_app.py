@@ -8,9 +8,11 @@ import subprocess
 import sys
 import os
 import time
-import threading
+import urllib.request
 from pathlib import Path
 
+BACKEND_HEALTH_URL = "http://localhost:8000/api/health"
+
 def install_python_deps():
     """Install Python dependencies"""
     print("🔧 Installing Python dependencies...")
@@ -40,14 +42,24 @@ def install_react_deps():
     return True
 
 def start_backend():
-    """Start FastAPI backend server"""
+    """Start FastAPI backend server as a child process"""
     print("🚀 Starting FastAPI backend server on http://localhost:8000...")
-    try:
-        subprocess.run([sys.executable, "api_server.py"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Backend server error: {e}")
-    except KeyboardInterrupt:
-        print("\n🛑 Backend server stopped")
+    return subprocess.Popen([sys.executable, "api_server.py"])
+
+def wait_for_backend(backend, timeout=30.0):
+    """Poll the backend health endpoint until it responds, the process exits, or timeout"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if backend.poll() is not None:
+            print(f"❌ Backend server exited with code {backend.returncode}")
+            return False
+        try:
+            with urllib.request.urlopen(BACKEND_HEALTH_URL, timeout=0.25):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    print(f"⚠️ Backend not responding after {timeout:.0f}s, starting frontend anyway")
+    return True
 
 def start_frontend():
     """Start React frontend server"""
@@ -90,18 +102,24 @@ def main():
     print("✅ Dependencies check passed")
     print("\n🚀 Starting servers...")
     
-    # Start backend in a thread
-    backend_thread = threading.Thread(target=start_backend, daemon=True)
-    backend_thread.start()
-    
-    # Wait a moment for backend to start
-    time.sleep(3)
+    # Start backend and wait until it answers health checks
+    backend = start_backend()
+    if not wait_for_backend(backend):
+        sys.exit(1)
     
     # Start frontend (blocking)
     try:
         start_frontend()
     except KeyboardInterrupt:
         print("\n🛑 Application stopped")
+    finally:
+        if backend.poll() is None:
+            backend.terminate()
+            try:
+                backend.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                backend.kill()
+        print("🛑 Backend server stopped")
 
 if __name__ == "__main__":
     main()